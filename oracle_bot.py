@@ -1,18 +1,59 @@
 import discord
+import aiohttp
 from discord import app_commands
 from discord.ui import Button, View
 import random
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter, deque, OrderedDict
 import os
 import io
 from PIL import Image, ImageDraw
-import requests
 import json
-from datetime import datetime
+import logging
+from datetime import datetime, timedelta
+from types import MappingProxyType
+from operator import itemgetter
 import base64
+import sqlite3
+import signal
+
+# Image pipeline diagnostics. client.run() only attaches its handler to the "discord" logger, so this is a child of it
+# to have its records propagate there. LOG_LEVEL=DEBUG shows per-draw detail
+logger = logging.getLogger("discord.oracle")
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# getLevelName maps a known level name to its number; anything else comes back as a "Level ..." string
+if isinstance(logging.getLevelName(LOG_LEVEL), int):
+    logger.setLevel(LOG_LEVEL)
+else:
+    logger.setLevel(logging.INFO)
+    logger.warning("Unknown LOG_LEVEL %r, using INFO", LOG_LEVEL)
 
 # Bot setup
 intents = discord.Intents.default()
-client = discord.Client(intents=intents)
+class OracleClient(discord.Client):
+    async def setup_hook(self):
+        # client.run() only handles Ctrl+C; Railway redeploys send SIGTERM, which should still flush journals and decks
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, self.request_shutdown)
+        except NotImplementedError:
+            pass
+
+    def request_shutdown(self):
+        self.shutdown_task = asyncio.create_task(self.close())
+
+    async def close(self):
+        # Waits out any save the flush loop has in flight before committing the rest and stopping it
+        await flush_journals()
+        if journal_flush_task:
+            journal_flush_task.cancel()
+        await flush_deck_state()
+        if deck_flush_task:
+            deck_flush_task.cancel()
+        await close_http_session()
+        await super().close()
+
+client = OracleClient(intents=intents)
 tree = app_commands.CommandTree(client)
 
 # GitHub repo settings for card images
@@ -22,29 +63,34 @@ GITHUB_BRANCH = "main"
 IMAGE_FOLDER = "card_images"
 JOURNAL_FILE = "journals.json"
 DECKS_FILE = "decks.json"
+DECK_STATE_DB = os.getenv('DECK_STATE_DB', 'deck_state.db')
+# Card images are served through jsDelivr; pin this to a tag or commit SHA so the CDN can cache them long-term
+IMAGE_CDN_REF = os.getenv('IMAGE_CDN_REF', GITHUB_BRANCH)
 
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN')
 
 active_decks = {}
 loaded_decks = {}
 
-def load_decks_from_github():
+async def load_decks_from_github():
     url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{GITHUB_REPO}/contents/{DECKS_FILE}"
     headers = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            content = base64.b64decode(response.json()['content']).decode('utf-8')
+        async with http_session.get(url, headers=headers) as response:
+            status = response.status
+            body = await response.json(content_type=None) if status == 200 else None
+        if status == 200:
+            content = base64.b64decode(body['content']).decode('utf-8')
             decks_data = json.loads(content)
             loaded_decks.update(decks_data)
             print(f"Loaded {len(decks_data)} decks from GitHub")
             return True
-        elif response.status_code == 404:
+        elif status == 404:
             print("No decks.json found, using default deck")
             loaded_decks["Demo Tarot"] = {"cards": CARDS, "image_folder": "tarot"}
             return False
         else:
-            print(f"Error loading decks: {response.status_code}")
+            print(f"Error loading decks: {status}")
             loaded_decks["Demo Tarot"] = {"cards": CARDS, "image_folder": "tarot"}
             return False
     except Exception as e:
@@ -52,6 +98,10 @@ def load_decks_from_github():
         loaded_decks["Demo Tarot"] = {"cards": CARDS, "image_folder": "tarot"}
         return False
 
+def get_scope_id(interaction):
+    """Deck state is per guild, or per user in DMs"""
+    return interaction.guild_id or interaction.user.id
+
 def get_active_deck(guild_id):
     if guild_id not in active_decks:
         active_decks[guild_id] = list(loaded_decks.keys())[0] if loaded_decks else "Demo Tarot"
@@ -74,30 +124,83 @@ def get_card_meaning(card_name, guild_id):
     cards = get_deck_cards(guild_id)
     return cards.get(card_name, "Card meaning not found")
 
-def get_journals_from_github():
+# Last fetched journals.json; reads revalidate with If-None-Match so an unchanged file isn't downloaded again
+# "pending" is set while in-memory edits haven't reached GitHub yet; reads then serve the cache
+# "index" maps (user_id, lowercased name) to each entry for O(1) existence checks and deletes
+# "by_user" holds each user's entries sorted newest first, dropped whenever that user's entries change
+journal_cache = {"etag": None, "sha": None, "journals": [], "index": {}, "by_user": {}, "pending": False}
+journals_dirty = False
+# Edits not yet on GitHub, as ("add", entry) / ("delete", key); replayed onto a fresh copy after a sha conflict
+pending_journal_edits = []
+# Set once GitHub rejects a save outright; the edits stay queued but retry slowly
+journal_save_rejected = False
+# How many of pending_journal_edits have had their owners told about the rejection
+journal_edits_notified = 0
+journal_flush_task = None
+# Interactions can arrive before on_ready finishes, so the lock exists from import (asyncio.Lock binds its loop lazily)
+journal_lock = asyncio.Lock()
+
+def journal_key(user_id, name):
+    return (user_id, name.lower())
+
+def set_journal_cache(journals, **fields):
+    journal_cache.update(
+        journals=journals,
+        index={journal_key(j.get("user_id"), j.get("name")): j for j in journals},
+        by_user={},
+        **fields
+    )
+
+async def refresh_journal_cache(force=False):
+    """
+    Brings journal_cache up to date with GitHub; returns False if journals.json couldn't be read.
+    Callers hold journal_lock, so no edit or save can land while the GET is in flight and be overwritten by it.
+    """
     url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{GITHUB_REPO}/contents/{JOURNAL_FILE}"
     headers = {"Authorization": f"token {GITHUB_TOKEN}"} if GITHUB_TOKEN else {}
+    if journal_cache["pending"] and not force:
+        return True
+    if journal_cache["etag"] and not force:
+        headers["If-None-Match"] = journal_cache["etag"]
     try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 200:
-            content = base64.b64decode(response.json()['content']).decode('utf-8')
-            return json.loads(content), response.json()['sha']
-        elif response.status_code == 404:
-            return [], None
+        async with http_session.get(url, headers=headers) as response:
+            status = response.status
+            etag = response.headers.get('ETag')
+            body = await response.json(content_type=None) if status == 200 else None
+        if status == 304:
+            return True
+        elif status == 200:
+            content = base64.b64decode(body['content']).decode('utf-8')
+            set_journal_cache(json.loads(content), etag=etag, sha=body['sha'])
+            return True
+        elif status == 404:
+            set_journal_cache([], etag=None, sha=None)
+            return True
         else:
-            print(f"Error fetching journals: {response.status_code}")
-            return [], None
+            print(f"Error fetching journals: {status}")
+            return False
     except Exception as e:
         print(f"Error loading journals: {e}")
-        return [], None
+        return False
 
-def save_journals_to_github(journals, sha=None):
+def get_user_journals(user_id):
+    entries = journal_cache["by_user"].get(user_id)
+    if entries is None:
+        entries = sorted(
+            (j for j in journal_cache["journals"] if j.get("user_id") == user_id),
+            key=itemgetter('timestamp'), reverse=True
+        )
+        journal_cache["by_user"][user_id] = entries
+    return entries
+
+async def save_journals_to_github(journals, sha=None):
+    """Returns the PUT's HTTP status, or None if the request never completed"""
     if not GITHUB_TOKEN:
         print("ERROR: GITHUB_TOKEN not set!")
-        return False
+        return None
     url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{GITHUB_REPO}/contents/{JOURNAL_FILE}"
     headers = {"Authorization": f"token {GITHUB_TOKEN}", "Content-Type": "application/json"}
-    content = json.dumps(journals, indent=2)
+    content = json.dumps(journals, separators=(',', ':'), ensure_ascii=False)
     encoded_content = base64.b64encode(content.encode('utf-8')).decode('utf-8')
     data = {
         "message": f"Update journals - {datetime.utcnow().strftime('%Y-%m-%d %H:%M')} UTC",
@@ -107,46 +210,155 @@ def save_journals_to_github(journals, sha=None):
     if sha:
         data["sha"] = sha
     try:
-        response = requests.put(url, headers=headers, json=data)
-        if response.status_code in [200, 201]:
+        async with http_session.put(url, headers=headers, json=data) as response:
+            status = response.status
+            text = await response.text()
+        if status in [200, 201]:
+            # The PUT response carries the new blob sha but not the contents ETag, so the next read refetches
+            journal_cache.update(etag=None, sha=json.loads(text)['content']['sha'])
             print("Journals saved successfully to GitHub")
-            return True
         else:
-            print(f"Error saving journals: {response.status_code} - {response.text}")
-            return False
+            print(f"Error saving journals: {status} - {text}")
+        return status
     except Exception as e:
         print(f"Error saving journals: {e}")
-        return False
+        return None
 
-last_readings = {}
+def queue_journal_save():
+    """Schedules the cached journal list for the next GitHub commit"""
+    global journals_dirty
+    journal_cache["pending"] = True
+    journals_dirty = True
+
+def apply_journal_edit(op, value):
+    if op == "add":
+        key = journal_key(value["user_id"], value["name"])
+        if key in journal_cache["index"]:
+            return
+        journal_cache["journals"].append(value)
+        journal_cache["index"][key] = value
+        journal_cache["by_user"].pop(value["user_id"], None)
+    else:
+        set_journal_cache([j for j in journal_cache["journals"] if journal_key(j.get("user_id"), j.get("name")) != value])
+
+def add_journal_entry(entry):
+    pending_journal_edits.append(("add", entry))
+    apply_journal_edit("add", entry)
+    queue_journal_save()
+
+def delete_journal_entry(key):
+    pending_journal_edits.append(("delete", key))
+    apply_journal_edit("delete", key)
+    queue_journal_save()
+
+def clear_pending_journal_edits():
+    global journals_dirty, journal_save_rejected, journal_edits_notified
+    journals_dirty = False
+    journal_save_rejected = False
+    journal_edits_notified = 0
+    journal_cache["pending"] = False
+    pending_journal_edits.clear()
+
+async def rebase_journal_edits():
+    """Reloads journals.json after a sha conflict and replays the queued edits on top of it"""
+    if not await refresh_journal_cache(force=True):
+        return False
+    for op, value in pending_journal_edits:
+        apply_journal_edit(op, value)
+    return True
+
+async def notify_journal_save_failed(edits):
+    """DMs each user whose queued journal edits GitHub refused to save"""
+    names_by_user = {}
+    for op, value in edits:
+        user_id, name = (value["user_id"], value["name"]) if op == "add" else value
+        names_by_user.setdefault(int(user_id), []).append(name)
+    for user_id, names in names_by_user.items():
+        try:
+            user = client.get_user(user_id) or await client.fetch_user(user_id)
+            await user.send(
+                f"⚠️ Your journal changes to {', '.join(f'**{name}**' for name in names)} couldn't be saved to GitHub. "
+                "They're kept for now and will be retried, but will be lost if the bot restarts before a save succeeds."
+            )
+        except Exception as e:
+            print(f"Error notifying user {user_id} of a failed journal save: {e}")
+
+async def flush_journals():
+    """Commits queued journal edits; returns False if the save should be retried later"""
+    global journal_save_rejected, journal_edits_notified
+    if not journals_dirty:
+        return True
+    # Edits and saves share journal_lock, so nothing changes the journals mid-PUT and two saves never race on one sha
+    async with journal_lock:
+        if not journals_dirty:
+            return True
+        status = await save_journals_to_github(journal_cache["journals"], journal_cache["sha"])
+        if status == 409 and await rebase_journal_edits():
+            status = await save_journals_to_github(journal_cache["journals"], journal_cache["sha"])
+        if status in (200, 201):
+            clear_pending_journal_edits()
+            return True
+        if status is None or status in (409, 429) or status >= 500:
+            return False
+        # A retry alone can't fix a rejected write, so the edits stay queued and their owners hear about it
+        print(f"ERROR: GitHub rejected the journal save ({status}); keeping {len(pending_journal_edits)} unsaved edit(s) queued")
+        journal_save_rejected = True
+        edits = pending_journal_edits[journal_edits_notified:]
+        journal_edits_notified = len(pending_journal_edits)
+    if edits:
+        await notify_journal_save_failed(edits)
+    return False
+
+async def flush_journals_loop(interval=2, retry_delay=30, rejected_retry_delay=600):
+    """Coalesces journal edits made within interval seconds into one GitHub commit"""
+    while True:
+        await asyncio.sleep(interval)
+        if not await flush_journals():
+            await asyncio.sleep(rejected_retry_delay if journal_save_rejected else retry_delay)
+
+# Each user's last finished reading for /journal, least recently saved dropped first
+MAX_LAST_READINGS = 10000
+last_readings = OrderedDict()
 
 reading_stats = {
     "total_readings": 0,
-    "readings_by_date": {},
-    "readings_by_person": {},
-    "cards_drawn": {},
+    "readings_by_date": Counter(),
+    "readings_by_person": Counter(),
+    "cards_drawn": Counter(),
     "last_reading_date": None
 }
 
-def check_emergent_draw(guild_id):
+def pop_random_card(deck):
+    index = random.randint(0, len(deck) - 1)
+    card = deck[index]
+    del deck[index]
+    return card
+
+def random_reversals(count):
+    """One reversed/upright flag per card, taken from a single getrandbits draw"""
+    bits = random.getrandbits(count)
+    return [bool(bits >> i & 1) for i in range(count)]
+
+async def check_emergent_draw(guild_id):
     """
     Simulates cards slipping out during a shuffle.
       - 0.25%  → Manifested Draw: 2 cards slip out.
       - 1.25%  → Emergent Draw:   1 card slips out.
     Returns (list_of_lost_cards, draw_type_string) or ([], None).
     """
-    deck = get_deck(guild_id)
+    deck = await get_deck(guild_id)
     roll = random.random()
 
     if roll < 0.0005:
         if len(deck) >= 2:
-            lost = [deck.pop(random.randint(0, len(deck) - 1))]
-            lost.append(deck.pop(random.randint(0, len(deck) - 1)))
+            lost = [pop_random_card(deck), pop_random_card(deck)]
+            mark_deck_dirty(guild_id)
             print(f"Manifested Draw triggered! Cards: {lost}")
             return lost, "Manifested Draw"
     elif roll < 0.01:
         if len(deck) >= 1:
-            lost = [deck.pop(random.randint(0, len(deck) - 1))]
+            lost = [pop_random_card(deck)]
+            mark_deck_dirty(guild_id)
             print(f"Emergent Draw triggered! Card: {lost}")
             return lost, "Emergent Draw"
 
@@ -162,10 +374,10 @@ async def send_emergent_draw_message(interaction, lost_cards, draw_type, guild_i
         return
 
     cards = get_deck_cards(guild_id)
-    reversed_cards = [random.choice([True, False]) for _ in lost_cards]
+    reversed_cards = random_reversals(len(lost_cards))
     revealed_indices = set(range(len(lost_cards)))
 
-    composite_bytes = create_composite_image(lost_cards, revealed_indices, reversed_cards, guild_id)
+    composite_bytes = await create_composite_image(lost_cards, revealed_indices, reversed_cards, guild_id)
 
     if draw_type == "Emergent Draw":
         title = "✦ Emergent Draw"
@@ -199,11 +411,25 @@ async def send_emergent_draw_message(interaction, lost_cards, draw_type, guild_i
 
     if composite_bytes:
         embed.set_image(url="attachment://emergent.png")
-        file = discord.File(composite_bytes, filename="emergent.png")
+        file = discord.File(io.BytesIO(composite_bytes), filename="emergent.png")
         await interaction.followup.send(embed=embed, file=file)
     else:
         await interaction.followup.send(embed=embed)
 
+async def get_user_name(user_id):
+    """Reads the client's user cache first and only hits the API on a miss"""
+    user = client.get_user(user_id) or await client.fetch_user(user_id)
+    return user.name
+
+def format_journal_cards(cards):
+    return "\n".join(
+        f"• **{card['position']}:** {card['name']}{' (Reversed)' if card['reversed'] else ''}"
+        for card in cards
+    )
+
+def format_journal_line(entry):
+    return f"• **{entry['name']}** - {datetime.fromisoformat(entry['timestamp']).strftime('%b %d, %Y')}"
+
 class JournalPaginationView(View):
     def __init__(self, entries, user_id, page=0, per_page=10):
         super().__init__(timeout=180)
@@ -212,6 +438,8 @@ class JournalPaginationView(View):
         self.page = page
         self.per_page = per_page
         self.max_page = (len(entries) - 1) // per_page
+        # Formatted once so page flips don't reparse every timestamp
+        self.entry_lines = [format_journal_line(j) for j in entries]
 
         prev_button = Button(label="◀ Previous", style=discord.ButtonStyle.primary, disabled=(page == 0))
         prev_button.callback = self.previous_page
@@ -238,12 +466,7 @@ class JournalPaginationView(View):
     async def update_message(self, interaction: discord.Interaction):
         start = self.page * self.per_page
         end = start + self.per_page
-        page_entries = self.entries[start:end]
-
-        entries_list = "\n".join([
-            f"• **{j['name']}** - {datetime.fromisoformat(j['timestamp']).strftime('%b %d, %Y')}"
-            for j in page_entries
-        ])
+        entries_list = "\n".join(self.entry_lines[start:end])
 
         embed = discord.Embed(
             title=f"📖 Your Journal ({len(self.entries)} entries)",
@@ -320,23 +543,108 @@ class DailyCardView(View):
         modal = DailyCardModal(self.card_name, self.is_reversed, self.channel, self.guild_id)
         await interaction.response.send_modal(modal)
 
-def get_card_image_url(card_name, guild_id=None):
+def card_image_base_url(deck_folder):
+    return f"https://cdn.jsdelivr.net/gh/{GITHUB_USERNAME}/{GITHUB_REPO}@{IMAGE_CDN_REF}/{IMAGE_FOLDER}/{deck_folder}"
+
+def build_card_image_url(card_name, deck_folder):
     filename = card_name.lower().replace(" ", "-").replace("•", "").strip()
-    filename = f"{filename}.png"
-    if guild_id:
-        deck_folder = get_deck_image_folder(guild_id)
+    return f"{card_image_base_url(deck_folder)}/{filename}.png"
+
+# Per-deck lookup tables are precomputed once so commands only do a dict lookup
+card_image_urls = {}
+card_back_urls = {}
+deck_card_names = {}
+deck_card_lookup = {}
+
+def build_deck_tables():
+    """Rebuild the per-deck card name and image URL tables from loaded_decks"""
+    card_image_urls.clear()
+    card_back_urls.clear()
+    deck_card_names.clear()
+    deck_card_lookup.clear()
+    for deck_name, deck_data in loaded_decks.items():
+        deck_folder = deck_data.get("image_folder", "tarot")
+        deck_card_names[deck_name] = tuple(deck_data["cards"])
+        urls = {name: build_card_image_url(name, deck_folder) for name in deck_data["cards"]}
+        card_image_urls[deck_name] = urls
+        deck_card_lookup[deck_name] = build_card_lookup(deck_data["cards"])
+        card_back_urls[deck_name] = f"{card_image_base_url(deck_folder)}/card-back.png"
+
+def build_card_lookup(card_names):
+    """(exact lowercase name -> name, ((lowercase name, name), ...)) for card searches"""
+    lowered = tuple((name.lower(), name) for name in card_names)
+    return dict(lowered), lowered
+
+def find_cards(query, guild_id):
+    """Exact (case-insensitive) match first, otherwise every card whose name contains the query"""
+    deck_name = get_active_deck(guild_id)
+    if deck_name in deck_card_lookup:
+        by_lower, lowered = deck_card_lookup[deck_name]
     else:
-        deck_folder = "tarot"
-    return f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{GITHUB_REPO}/{GITHUB_BRANCH}/{IMAGE_FOLDER}/{deck_folder}/{filename}"
+        by_lower, lowered = build_card_lookup(get_deck_cards(guild_id))
+    query = query.lower()
+    if query in by_lower:
+        return [by_lower[query]]
+    return [name for lower, name in lowered if query in lower]
+
+def get_card_image_url(card_name, guild_id=None):
+    if guild_id:
+        deck_name = get_active_deck(guild_id)
+        url = card_image_urls.get(deck_name, {}).get(card_name)
+        if url is None:
+            url = build_card_image_url(card_name, get_deck_image_folder(guild_id))
+        return url
+    return CARD_IMAGE_URLS.get(card_name) or build_card_image_url(card_name, "tarot")
+
+def get_card_meanings(cards, guild_id):
+    """Resolve each card name to its meaning in the active deck"""
+    meanings = get_deck_cards(guild_id)
+    return [meanings.get(name, "") for name in cards]
 
 def get_card_back_url(guild_id=None):
     if guild_id:
-        deck_folder = get_deck_image_folder(guild_id)
-    else:
-        deck_folder = "tarot"
-    return f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{GITHUB_REPO}/{GITHUB_BRANCH}/{IMAGE_FOLDER}/{deck_folder}/card-back.png"
+        deck_name = get_active_deck(guild_id)
+        return card_back_urls.get(deck_name) or f"{card_image_base_url(get_deck_image_folder(guild_id))}/card-back.png"
+    return CARD_BACK_URL
+
+# Decoded card images by URL, least recently used evicted first
+MAX_IMAGE_CACHE = 128
+image_cache = OrderedDict()
+
+def get_cached_image(url):
+    img = image_cache.get(url)
+    if img is not None:
+        image_cache.move_to_end(url)
+    return img
+
+def cache_image(url, img):
+    image_cache[url] = img
+    image_cache.move_to_end(url)
+    while len(image_cache) > MAX_IMAGE_CACHE:
+        evicted_url, _ = image_cache.popitem(last=False)
+        resized_cache.pop(evicted_url, None)
+
+# Shared keep-alive session for card image downloads and GitHub API calls, opened in on_ready
+http_session = None
+
+async def open_http_session():
+    global http_session
+    if http_session is None or http_session.closed:
+        http_session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=10),
+            headers={"User-Agent": "OracleBot/1.0"}
+        )
 
-image_cache = {}
+async def close_http_session():
+    if http_session is not None and not http_session.closed:
+        await http_session.close()
+
+# PIL decoding, compositing and encoding run here instead of on the event loop
+composite_executor = ThreadPoolExecutor(max_workers=4)
+
+async def run_image_work(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(composite_executor, func, *args)
 
 def create_fallback_card_back(width=200, height=350):
     img = Image.new('RGBA', (width, height), (30, 10, 60, 255))
@@ -348,113 +656,207 @@ def create_fallback_card_back(width=200, height=350):
     draw.ellipse([cx - 10, cy - 30, cx + 50, cy + 30], fill=(30, 10, 60, 255))
     return img
 
-def download_card_image(url, rotate=False):
-    cache_key = f"{url}_rotated" if rotate else url
-    if cache_key in image_cache:
-        return image_cache[cache_key]
+def to_paste_mode(img):
+    """Fully opaque cards become RGB so they paste without alpha blending; real transparency stays RGBA"""
+    if img.mode == 'RGB':
+        return img
+    if img.mode != 'RGBA':
+        img = img.convert('RGBA')
+    if img.getextrema()[3][0] == 255:
+        return img.convert('RGB')
+    return img
+
+def decode_card_image(data):
+    img = Image.open(io.BytesIO(data))
+    img.load()
+    return to_paste_mode(img)
+
+async def download_card_image(url):
+    img = get_cached_image(url)
+    if img is not None:
+        return img
     try:
-        response = requests.get(url, timeout=10)
-        print(f"Downloaded {url}: status={response.status_code}, size={len(response.content)}")
-        if response.status_code == 200:
+        async with http_session.get(url) as response:
+            data = await response.read()
+            status = response.status
             content_type = response.headers.get('content-type', '')
-            if 'image' not in content_type:
-                if 'card-back' in url:
-                    img = create_fallback_card_back()
-                    image_cache[cache_key] = img.copy()
-                    return img
-                return None
-            img = Image.open(io.BytesIO(response.content))
-            img.load()
-            if img.mode != 'RGBA':
-                img = img.convert('RGBA')
-            if rotate:
-                img = img.rotate(180, expand=True)
-            image_cache[cache_key] = img.copy()
-            return img
+        logger.debug("Downloaded %s: status=%s, size=%s", url, status, len(data))
+        if status == 200 and 'image' in content_type:
+            img = await run_image_work(decode_card_image, data)
+        elif 'card-back' in url:
+            img = to_paste_mode(create_fallback_card_back())
         else:
-            if 'card-back' in url:
-                img = create_fallback_card_back()
-                if rotate:
-                    img = img.rotate(180, expand=True)
-                image_cache[cache_key] = img.copy()
-                return img
             return None
+        cache_image(url, img)
+        return img
     except Exception as e:
-        print(f"Error downloading {url}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error downloading %s: %s", url, e)
         return None
 
-def create_composite_image(cards, revealed_indices, reversed_cards, guild_id=None):
+async def download_card_images(urls):
+    """Fetches each distinct URL once, concurrently; returns {url: image or None}"""
+    unique_urls = list(dict.fromkeys(urls))
+    images = await asyncio.gather(*(download_card_image(url) for url in unique_urls))
+    return dict(zip(unique_urls, images))
+
+async def prewarm_image_cache():
+    """Downloads card backs, then faces of the decks in use, into image_cache up to its capacity"""
+    # Stopping at MAX_IMAGE_CACHE keeps the warm-up from evicting what it just fetched
+    deck_names = list(dict.fromkeys([*active_decks.values(), *loaded_decks]))
+    urls = [card_back_urls[deck_name] for deck_name in deck_names if deck_name in card_back_urls]
+    for deck_name in deck_names:
+        urls.extend(card_image_urls.get(deck_name, {}).values())
+    await download_card_images(list(dict.fromkeys(urls))[:MAX_IMAGE_CACHE])
+    logger.info("Image cache warmed: %s images", len(image_cache))
+
+# Encoded composites keyed by deck back URL plus each slot's (card, reversed) or None if face-down
+# Capped by total size, since a 10-card PNG runs to a few MB; fully revealed deals are unique per reading and skip the cache
+MAX_COMPOSITE_CACHE_BYTES = 32_000_000
+composite_cache = OrderedDict()
+composite_cache_bytes = 0
+
+def cache_composite(cache_key, encoded):
+    global composite_cache_bytes
+    composite_cache[cache_key] = encoded
+    composite_cache_bytes += len(encoded)
+    while composite_cache_bytes > MAX_COMPOSITE_CACHE_BYTES:
+        _, evicted = composite_cache.popitem(last=False)
+        composite_cache_bytes -= len(evicted)
+
+# Downscaled card images for oversized composites: url -> {(reversed, width, height): image}
+# cache_image pops a URL's entry when it evicts that image, and sources missing from image_cache aren't cached here.
+# A resize on a composite thread racing that eviction can still leave one stale entry until the URL is next cached and evicted
+resized_cache = {}
+
+def get_resized_card(img, key, width, height):
+    url, is_reversed = key
+    if url not in image_cache:
+        return img.resize((width, height), Image.Resampling.BILINEAR)
+    variants = resized_cache.setdefault(url, {})
+    resized = variants.get((is_reversed, width, height))
+    if resized is None:
+        resized = variants[(is_reversed, width, height)] = img.resize((width, height), Image.Resampling.BILINEAR)
+    return resized
+
+def composite_cache_key(cards, revealed_indices, reversed_cards, card_back_url):
+    return (card_back_url, tuple(
+        (card_name, reversed_cards[i]) if i in revealed_indices else None
+        for i, card_name in enumerate(cards)
+    ))
+
+def encode_image(img, **save_args):
+    """Encodes into a scratch buffer that is released as soon as the bytes are taken"""
+    with io.BytesIO() as buffer:
+        img.save(buffer, **save_args)
+        return buffer.getvalue()
+
+def compose_card_images(card_images, image_keys):
+    """
+    Lays card images out side by side and returns the encoded bytes.
+    image_keys holds each slot's (url, reversed); reversed cards are flipped here.
+    """
+    card_images = [
+        img.transpose(Image.Transpose.ROTATE_180) if is_reversed else img
+        for img, (_, is_reversed) in zip(card_images, image_keys)
+    ]
+    card_width, card_height = card_images[0].size
+    spacing = 20
+    total_width = (card_width * len(card_images)) + (spacing * (len(card_images) - 1))
+    total_height = card_height
+
+    max_width = 3000
+    if total_width > max_width:
+        scale_factor = max_width / total_width
+        card_width = int(card_width * scale_factor)
+        card_height = int(card_height * scale_factor)
+        spacing = int(spacing * scale_factor)
+        total_width = (card_width * len(card_images)) + (spacing * (len(card_images) - 1))
+        total_height = card_height
+        card_images = [
+            get_resized_card(img, key, card_width, card_height)
+            for key, img in zip(image_keys, card_images)
+        ]
+
+    composite = Image.new('RGB', (total_width, total_height), (20, 20, 30))
+    x_offset = 0
+    for img in card_images:
+        composite.paste(img, (x_offset, 0), img if img.mode == 'RGBA' else None)
+        x_offset += card_width + spacing
+
+    encoded = encode_image(composite, format='PNG', compress_level=1)
+
+    if len(encoded) > 6_500_000:
+        encoded = encode_image(composite, format='JPEG', quality=75, optimize=True, progressive=True, subsampling=2)
+
+        if len(encoded) > 6_500_000:
+            scale = 0.75
+            new_size = (int(composite.width * scale), int(composite.height * scale))
+            resized = composite.resize(new_size, Image.Resampling.BILINEAR)
+            encoded = encode_image(resized, format='JPEG', quality=75, optimize=True, progressive=True, subsampling=2)
+            resized.close()
+
+    composite.close()
+    return encoded
+
+# Face-down deals depend only on the deck's card back and the card count, so each is rendered once
+MAX_SPREAD_CARDS = 10
+facedown_composites = {}
+
+async def get_facedown_composite(card_back_url, count):
+    cached = facedown_composites.get((card_back_url, count))
+    if cached is None:
+        back = await download_card_image(card_back_url)
+        if back is None:
+            return None
+        cached = await run_image_work(compose_card_images, [back] * count, [(card_back_url, False)] * count)
+        facedown_composites[(card_back_url, count)] = cached
+    return cached
+
+async def prerender_facedown_composites():
+    for card_back_url in set(card_back_urls.values()):
+        try:
+            for count in range(1, MAX_SPREAD_CARDS + 1):
+                await get_facedown_composite(card_back_url, count)
+        except Exception as e:
+            logger.error("Error pre-rendering face-down composites: %s", e)
+    logger.info("Pre-rendered %s face-down composites", len(facedown_composites))
+
+async def create_composite_image(cards, revealed_indices, reversed_cards, guild_id=None):
     try:
-        card_images = []
         card_back_url = get_card_back_url(guild_id)
 
-        print(f"Creating composite for {len(cards)} cards, revealed: {revealed_indices}")
+        if not revealed_indices:
+            return await get_facedown_composite(card_back_url, len(cards))
 
-        for i, card_name in enumerate(cards):
-            if i in revealed_indices:
-                url = get_card_image_url(card_name, guild_id)
-                is_reversed = reversed_cards[i]
-                img = download_card_image(url, rotate=is_reversed)
-            else:
-                img = download_card_image(card_back_url, rotate=False)
+        cache_key = composite_cache_key(cards, revealed_indices, reversed_cards, card_back_url)
+        cached = composite_cache.get(cache_key)
+        if cached is not None:
+            composite_cache.move_to_end(cache_key)
+            return cached
 
-            if img:
-                card_images.append(img.copy())
-            else:
-                print(f"Failed to get image for card {i}")
-                return None
+        logger.debug("Creating composite for %s cards, revealed: %s", len(cards), revealed_indices)
 
-        if not card_images:
-            return None
+        image_keys = [
+            (get_card_image_url(card_name, guild_id), reversed_cards[i]) if i in revealed_indices else (card_back_url, False)
+            for i, card_name in enumerate(cards)
+        ]
+        downloaded = await download_card_images(url for url, _ in image_keys)
 
-        card_width, card_height = card_images[0].size
-        spacing = 20
-        total_width = (card_width * len(card_images)) + (spacing * (len(card_images) - 1))
-        total_height = card_height
+        card_images = []
+        for i, (url, _) in enumerate(image_keys):
+            img = downloaded[url]
+            if img is None:
+                logger.warning("Failed to get image for card %s", i)
+                return None
+            card_images.append(img)
 
-        max_width = 3000
-        if total_width > max_width:
-            scale_factor = max_width / total_width
-            card_width = int(card_width * scale_factor)
-            card_height = int(card_height * scale_factor)
-            spacing = int(spacing * scale_factor)
-            total_width = (card_width * len(card_images)) + (spacing * (len(card_images) - 1))
-            total_height = card_height
-            card_images = [img.resize((card_width, card_height), Image.Resampling.LANCZOS) for img in card_images]
-
-        composite = Image.new('RGBA', (total_width, total_height), (0, 0, 0, 0))
-        x_offset = 0
-        for img in card_images:
-            composite.paste(img, (x_offset, 0))
-            x_offset += card_width + spacing
-
-        img_bytes = io.BytesIO()
-        composite.save(img_bytes, format='PNG', optimize=True)
-        file_size = img_bytes.getbuffer().nbytes
-
-        if file_size > 6_500_000:
-            img_bytes = io.BytesIO()
-            rgb_composite = Image.new('RGB', composite.size, (20, 20, 30))
-            rgb_composite.paste(composite, mask=composite.split()[3] if composite.mode == 'RGBA' else None)
-            rgb_composite.save(img_bytes, format='JPEG', quality=75, optimize=True)
-            file_size = img_bytes.getbuffer().nbytes
-
-            if file_size > 6_500_000:
-                scale = 0.75
-                new_size = (int(rgb_composite.width * scale), int(rgb_composite.height * scale))
-                rgb_composite = rgb_composite.resize(new_size, Image.Resampling.LANCZOS)
-                img_bytes = io.BytesIO()
-                rgb_composite.save(img_bytes, format='JPEG', quality=75, optimize=True)
-
-        img_bytes.seek(0)
-        print(f"Composite created: {img_bytes.getbuffer().nbytes / 1_000_000:.2f}MB")
-        return img_bytes
+        encoded = await run_image_work(compose_card_images, card_images, image_keys)
+        logger.debug("Composite created: %.2fMB", len(encoded) / 1_000_000)
+        if len(revealed_indices) < len(cards) and cache_key not in composite_cache:
+            cache_composite(cache_key, encoded)
+        return encoded
     except Exception as e:
-        print(f"Error creating composite image: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error creating composite image: %s", e)
         return None
 
 # Default card deck (used only as fallback if decks.json is missing)
@@ -482,174 +884,375 @@ CARDS = {
     "The World": "Completion, accomplishment, travel, fulfillment",
 }
 
-deck_state = {}
-undo_state = {}
+CARD_IMAGE_URLS = {name: build_card_image_url(name, "tarot") for name in CARDS}
+CARD_BACK_URL = f"{card_image_base_url('tarot')}/card-back.png"
+CARD_NAMES = tuple(CARDS)
+
+# Least-recently-used guild decks are dropped past this many guilds
+MAX_GUILD_DECKS = 10000
+
+# Dedicated generator for deck shuffles
+deck_rng = random.Random()
 
-def get_deck(guild_id):
-    if guild_id not in deck_state:
-        cards = get_deck_cards(guild_id)
-        deck_state[guild_id] = list(cards.keys())
-        random.shuffle(deck_state[guild_id])
-    return deck_state[guild_id]
+deck_state = OrderedDict()
+undo_state = OrderedDict()
+# Clarifiers keep extending the last draw's undo list; past this many cards the oldest stay drawn
+MAX_UNDO_CARDS = 32
+
+def get_deck_card_names(guild_id):
+    deck_name = get_active_deck(guild_id)
+    if deck_name in deck_card_names:
+        return deck_card_names[deck_name]
+    if deck_name in loaded_decks:
+        return tuple(loaded_decks[deck_name]["cards"])
+    return CARD_NAMES
+
+def new_shuffled_deck(guild_id):
+    names = get_deck_card_names(guild_id)
+    return deque(deck_rng.sample(names, len(names)))
+
+def deck_row(guild_id, deck):
+    return get_active_deck(guild_id), json.dumps(list(deck))
+
+def mark_deck_dirty(guild_id):
+    dirty_decks.add(guild_id)
+
+def store_deck(guild_id, deck):
+    deck_state[guild_id] = deck
+    deck_state.move_to_end(guild_id)
+    while len(deck_state) > MAX_GUILD_DECKS:
+        evicted_id, evicted_deck = deck_state.popitem(last=False)
+        # An unsaved deck is snapshotted on its way out so the next flush still writes it
+        if evicted_id in dirty_decks:
+            dirty_decks.discard(evicted_id)
+            evicted_deck_rows[evicted_id] = deck_row(evicted_id, evicted_deck)
+
+# deck_state is a write-back cache over a SQLite table so decks survive restarts.
+# Call sites that change a deck mark it dirty, and it's flushed in the background.
+dirty_decks = set()
+# guild_id -> (deck_name, cards) for dirty decks evicted from deck_state before their flush
+evicted_deck_rows = {}
+deck_store_ready = False
+deck_flush_task = None
+# Held across each flush's write so the shutdown flush never races the loop's
+deck_flush_lock = asyncio.Lock()
+
+# SQLite calls block, so these run in worker threads via asyncio.to_thread, each on its own connection
+def open_deck_store():
+    global deck_store_ready
+    conn = sqlite3.connect(DECK_STATE_DB)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS decks (guild_id INTEGER PRIMARY KEY, deck_name TEXT, cards TEXT)")
+        conn.commit()
+    finally:
+        conn.close()
+    deck_store_ready = True
+
+def read_stored_deck(guild_id):
+    conn = sqlite3.connect(DECK_STATE_DB)
+    try:
+        return conn.execute("SELECT deck_name, cards FROM decks WHERE guild_id = ?", (guild_id,)).fetchone()
+    finally:
+        conn.close()
+
+async def load_stored_deck(guild_id):
+    row = evicted_deck_rows.get(guild_id)
+    if row is None:
+        if not deck_store_ready:
+            return None
+        try:
+            row = await asyncio.to_thread(read_stored_deck, guild_id)
+        except sqlite3.Error as e:
+            print(f"Error reading stored deck: {e}")
+            return None
+    if row is None or row[0] != get_active_deck(guild_id):
+        return None
+    known = set(get_deck_card_names(guild_id))
+    return deque(card for card in json.loads(row[1]) if card in known)
+
+def write_stored_decks(rows):
+    conn = sqlite3.connect(DECK_STATE_DB)
+    try:
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO decks (guild_id, deck_name, cards) VALUES (?, ?, ?)", rows)
+    finally:
+        conn.close()
+
+async def flush_deck_state():
+    """Writes every unsaved deck in one SQLite transaction; failed rows stay queued for the next flush"""
+    async with deck_flush_lock:
+        if not dirty_decks and not evicted_deck_rows:
+            return
+        evicted = dict(evicted_deck_rows)
+        rows = dict(evicted)
+        for guild_id in dirty_decks:
+            rows[guild_id] = deck_row(guild_id, deck_state[guild_id])
+        dirty_decks.clear()
+        try:
+            await asyncio.to_thread(write_stored_decks, [(guild_id, *row) for guild_id, row in rows.items()])
+        except sqlite3.Error as e:
+            print(f"Error saving deck state: {e}")
+            for guild_id, row in rows.items():
+                if guild_id in deck_state:
+                    mark_deck_dirty(guild_id)
+                else:
+                    evicted_deck_rows.setdefault(guild_id, row)
+            return
+        for guild_id, row in evicted.items():
+            if evicted_deck_rows.get(guild_id) is row:
+                del evicted_deck_rows[guild_id]
+
+async def flush_deck_state_loop(interval=0.5):
+    """Batches dirty decks into one SQLite transaction every interval seconds"""
+    while True:
+        await asyncio.sleep(interval)
+        await flush_deck_state()
+
+async def get_deck(guild_id):
+    if guild_id in deck_state:
+        deck_state.move_to_end(guild_id)
+        return deck_state[guild_id]
+    deck = await load_stored_deck(guild_id)
+    # Another command may have loaded this guild's deck while the read was in flight
+    if guild_id in deck_state:
+        deck_state.move_to_end(guild_id)
+        return deck_state[guild_id]
+    if deck is None:
+        deck = new_shuffled_deck(guild_id)
+        mark_deck_dirty(guild_id)
+    store_deck(guild_id, deck)
+    return deck
 
 def shuffle_deck(guild_id):
     """Full reset — rebuilds the deck from scratch and shuffles"""
-    cards = get_deck_cards(guild_id)
-    deck_state[guild_id] = list(cards.keys())
-    random.shuffle(deck_state[guild_id])
+    deck = new_shuffled_deck(guild_id)
+    store_deck(guild_id, deck)
+    mark_deck_dirty(guild_id)
     if guild_id in undo_state:
         del undo_state[guild_id]
+    return deck
 
-def shuffle_remaining(guild_id):
+async def shuffle_remaining(guild_id):
     """Shuffles only the cards currently in the deck, leaving drawn cards out"""
-    deck = get_deck(guild_id)
-    random.shuffle(deck)
+    deck = await get_deck(guild_id)
+    # Shuffled as a list, since swapping deque items by index walks the deque's blocks
+    cards = list(deck)
+    deck_rng.shuffle(cards)
+    deck.clear()
+    deck.extend(cards)
+    mark_deck_dirty(guild_id)
+    return deck
 
 def save_undo_state(guild_id, cards):
-    undo_state[guild_id] = cards
-
-def can_undo(guild_id):
-    return guild_id in undo_state and len(undo_state[guild_id]) > 0
-
-def undo_draw(guild_id):
-    if not can_undo(guild_id):
+    undo_state[guild_id] = deque(cards, maxlen=MAX_UNDO_CARDS)
+    undo_state.move_to_end(guild_id)
+    while len(undo_state) > MAX_GUILD_DECKS:
+        undo_state.popitem(last=False)
+
+async def undo_draw(guild_id):
+    deck = await get_deck(guild_id)
+    cards = undo_state.pop(guild_id, None)
+    if not cards:
         return []
-    cards = undo_state[guild_id]
-    deck = get_deck(guild_id)
     for card in reversed(cards):
-        deck.insert(0, card)
-    del undo_state[guild_id]
+        deck.appendleft(card)
+    mark_deck_dirty(guild_id)
     return cards
 
 def save_last_reading(user_id, reading_data):
     last_readings[user_id] = reading_data
+    last_readings.move_to_end(user_id)
+    while len(last_readings) > MAX_LAST_READINGS:
+        last_readings.popitem(last=False)
 
 def track_reading(cards, for_user_id=None):
     today = datetime.utcnow().date().isoformat()
     reading_stats["total_readings"] += 1
-    if today not in reading_stats["readings_by_date"]:
-        reading_stats["readings_by_date"][today] = 0
     reading_stats["readings_by_date"][today] += 1
     person_key = str(for_user_id) if for_user_id else "personal"
-    if person_key not in reading_stats["readings_by_person"]:
-        reading_stats["readings_by_person"][person_key] = 0
     reading_stats["readings_by_person"][person_key] += 1
-    for card in cards:
-        if card not in reading_stats["cards_drawn"]:
-            reading_stats["cards_drawn"][card] = 0
-        reading_stats["cards_drawn"][card] += 1
+    reading_stats["cards_drawn"].update(cards)
     reading_stats["last_reading_date"] = today
 
+ALREADY_REVEALED_MSG = "This card has already been revealed! ✨"
+
+# Labels for unnamed positions, covering the largest (10-card) custom spread
+DEFAULT_POSITIONS = tuple(f"Card {i+1}" for i in range(10))
+
 class CardRevealView(View):
     def __init__(self, cards, positions, interaction, reversed_cards, guild_id, question=None, reading_type="draw", for_user=None):
         super().__init__(timeout=300)
         self.cards = cards
         self.reversed_cards = reversed_cards
-        self.revealed = set()
-        self.positions = positions or [f"Card {i+1}" for i in range(len(cards))]
+        self.revealed = bytearray(len(cards))  # 1 once that card is flipped
+        self.positions = positions or DEFAULT_POSITIONS[:len(cards)]
         self.interaction = interaction
         self.message = None
         self.question = question
         self.reading_type = reading_type
         self.for_user = for_user
-        self.guild_id = guild_id  # Store so we can pull meanings from the active deck
-
-        for i in range(len(cards)):
-            button = Button(
+        self.guild_id = guild_id
+        self._meanings = get_card_meanings(cards, guild_id)
+        self._rendered = [None] * len(cards)  # embed text per card, filled in as each is revealed
+        self._buttons = [
+            Button(
                 label=f"🎴 {self.positions[i]}",
                 style=discord.ButtonStyle.primary,
                 custom_id=f"card_{i}"
             )
-            button.callback = self.make_callback(i)
-            self.add_item(button)
-
-    def make_callback(self, index):
-        async def callback(interaction: discord.Interaction):
-            if index not in self.revealed:
-                self.revealed.add(index)
-
-                for item in self.children:
-                    if item.custom_id == f"card_{index}":
-                        item.label = f"✨ {self.positions[index]}"
-                        item.style = discord.ButtonStyle.success
-                        item.disabled = True
-
-                await interaction.response.defer()
-
-                composite_bytes = create_composite_image(self.cards, self.revealed, self.reversed_cards, self.guild_id)
-
-                if composite_bytes:
-                    file = discord.File(composite_bytes, filename="cards.png")
-
-                    # Pull meanings from the active deck, not the hardcoded fallback
-                    active_cards = get_deck_cards(self.guild_id)
-
-                    revealed_info = []
-                    for i in sorted(self.revealed):
-                        title = f"**{self.positions[i]}:** {self.cards[i]}"
-                        if self.reversed_cards[i]:
-                            title += " (Reversed)"
-                        meaning = active_cards.get(self.cards[i], "")
-                        if self.reversed_cards[i]:
-                            meaning = f"🔄 {meaning}\n*When reversed, this card's energy is blocked, internalized, or expressing in shadow form.*"
-                        revealed_info.append(f"{title}\n*{meaning}*")
-
-                    description = "\n\n".join(revealed_info) if revealed_info else "Click a card to reveal!"
-
-                    if self.question:
-                        description = f"❓ **Question:** *{self.question}*\n\n" + description
-
-                    embed = discord.Embed(
-                        title="🔮 Card Reading",
-                        description=description,
-                        color=discord.Color.purple()
-                    )
-                    embed.set_image(url="attachment://cards.png")
-                    embed.set_footer(text=f"{len(self.revealed)}/{len(self.cards)} cards revealed")
-
-                    await interaction.message.edit(embed=embed, view=self, attachments=[file])
-
-                    if len(self.revealed) == len(self.cards):
-                        reading_data = {
-                            "timestamp": datetime.utcnow().isoformat(),
-                            "reading_type": self.reading_type,
-                            "question": self.question,
-                            "for_user": self.for_user,
-                            "cards": [
-                                {
-                                    "name": self.cards[i],
-                                    "position": self.positions[i],
-                                    "reversed": self.reversed_cards[i]
-                                }
-                                for i in range(len(self.cards))
-                            ]
+            for i in range(len(cards))
+        ]
+
+        # View.add_item does the row layout, so it can't be skipped; bind it and the callback once
+        add_item = self.add_item
+        reveal_card = self.reveal_card
+        for button in self._buttons:
+            button.callback = reveal_card
+            add_item(button)
+
+    def revealed_indices(self):
+        return [i for i, flipped in enumerate(self.revealed) if flipped]
+
+    def render_card(self, i):
+        title = f"**{self.positions[i]}:** {self.cards[i]}"
+        meaning = self._meanings[i]
+        if self.reversed_cards[i]:
+            title += " (Reversed)"
+            meaning = f"🔄 {meaning}\n*When reversed, this card's energy is blocked, internalized, or expressing in shadow form.*"
+        return f"{title}\n*{meaning}*"
+
+    async def reveal_card(self, interaction: discord.Interaction):
+        index = int(interaction.data["custom_id"].rsplit("_", 1)[1])
+        if self.revealed[index]:
+            await interaction.response.send_message(ALREADY_REVEALED_MSG, ephemeral=True)
+            return
+
+        self.revealed[index] = 1
+        self._rendered[index] = self.render_card(index)
+        revealed_indices = self.revealed_indices()
+
+        button = self._buttons[index]
+        button.label = f"✨ {self.positions[index]}"
+        button.style = discord.ButtonStyle.success
+        button.disabled = True
+
+        await interaction.response.defer()
+
+        composite_bytes = await create_composite_image(self.cards, revealed_indices, self.reversed_cards, self.guild_id)
+
+        if composite_bytes:
+            file = discord.File(io.BytesIO(composite_bytes), filename="cards.png")
+
+            description = "\n\n".join(self._rendered[i] for i in revealed_indices) or "Click a card to reveal!"
+
+            if self.question:
+                description = f"❓ **Question:** *{self.question}*\n\n" + description
+
+            embed = discord.Embed(
+                title="🔮 Card Reading",
+                description=description,
+                color=discord.Color.purple()
+            )
+            embed.set_image(url="attachment://cards.png")
+            embed.set_footer(text=f"{len(revealed_indices)}/{len(self.cards)} cards revealed")
+
+            # Record a finished reading before the edit round-trip so /journal sees it straight away
+            if len(revealed_indices) == len(self.cards):
+                reading_data = {
+                    "timestamp": datetime.utcnow().isoformat(),
+                    "reading_type": self.reading_type,
+                    "question": self.question,
+                    "for_user": self.for_user,
+                    "cards": [
+                        {
+                            "name": self.cards[i],
+                            "position": self.positions[i],
+                            "reversed": self.reversed_cards[i]
                         }
-                        save_last_reading(interaction.user.id, reading_data)
-                        track_reading(self.cards, for_user_id=self.for_user)
-                else:
-                    await interaction.followup.send("Failed to load card image!", ephemeral=True)
-            else:
-                await interaction.response.send_message("This card has already been revealed! ✨", ephemeral=True)
+                        for i in range(len(self.cards))
+                    ]
+                }
+                save_last_reading(interaction.user.id, reading_data)
+                track_reading(self.cards, for_user_id=self.for_user)
+
+            await interaction.message.edit(embed=embed, view=self, attachments=[file])
+        else:
+            await interaction.followup.send("Failed to load card image!", ephemeral=True)
+
+SPREADS = MappingProxyType({
+    "past_present_future": ("Past", "Present", "Future"),
+    "mind_body_spirit": ("Mind", "Body", "Spirit"),
+    "situation_action_outcome": ("Situation", "Action", "Outcome"),
+})
+SPREAD_TITLES = MappingProxyType({key: key.replace("_", " • ").title() for key in SPREADS})
+
+# Static embed scaffolding, filled in per command via Embed.from_dict
+_SHUFFLE_EMBED_DICT = {"type": "rich", "title": "🔮 Deck Shuffled", "color": discord.Color.purple().value}
+_DRAW_EMBED_DICT = {"type": "rich", "color": discord.Color.blue().value, "image": {"url": "attachment://cards.png"}}
+_SPREAD_EMBED_DICT = {"type": "rich", "color": discord.Color.purple().value, "image": {"url": "attachment://cards.png"}}
+_UNDO_EMBED_DICT = {
+    "type": "rich", "title": "↩️ Draw Undone", "color": discord.Color.green().value,
+    "footer": {"text": "These cards have been placed back at the top of the deck"}
+}
+_UNDO_SHUFFLE_EMBED_DICT = {"type": "rich", "title": "↩️🔀 Undone & Shuffled", "color": discord.Color.green().value}
+_CLARIFIER_EMBED_DICT = {
+    "type": "rich", "title": "🔍 Clarifier Card", "color": discord.Color.gold().value,
+    "image": {"url": "attachment://cards.png"}
+}
+
+def embed_from_template(template, **fields):
+    return discord.Embed.from_dict({**template, **fields})
+
+RESHUFFLE_NOTE = "\n\n*The deck has been automatically reshuffled! 🔄*"
+
+async def draw_cards(guild_id, count, extend_undo=False):
+    """
+    Draws count cards, reshuffling first if too few remain.
+    Returns (drawn_cards, reshuffle_msg, cards_remaining).
+    """
+    deck = await get_deck(guild_id)
+    # Check-then-draw is atomic: nothing past get_deck awaits, so no other command can touch the deck midway
+    if len(deck) < count:
+        deck = shuffle_deck(guild_id)
+        reshuffle_msg = RESHUFFLE_NOTE
+    else:
+        reshuffle_msg = ""
 
-        return callback
+    drawn_cards = [deck.popleft() for _ in range(count)]
+    mark_deck_dirty(guild_id)
+    undo = undo_state.get(guild_id) if extend_undo else None
+    if undo:
+        undo.extend(drawn_cards)
+    else:
+        save_undo_state(guild_id, drawn_cards)
+    return drawn_cards, reshuffle_msg, len(deck)
+
+async def send_card_reading(interaction, view, embed, **send_args):
+    """Sends a deferred reading with its cards face-down, ready for the view's reveal buttons"""
+    composite_bytes = await create_composite_image(view.cards, set(), view.reversed_cards, view.guild_id)
+
+    if composite_bytes:
+        file = discord.File(io.BytesIO(composite_bytes), filename="cards.png")
+        await interaction.followup.send(embed=embed, file=file, view=view, **send_args)
+    else:
+        await interaction.followup.send("Failed to create card display. Please try again!", ephemeral=True)
 
 @tree.command(name="shuffle", description="Fully reset and shuffle the deck")
 async def shuffle(interaction: discord.Interaction):
-    guild_id = interaction.guild_id or interaction.user.id
-    shuffle_deck(guild_id)
-    deck = get_deck(guild_id)
+    guild_id = get_scope_id(interaction)
+    deck = shuffle_deck(guild_id)
 
     await interaction.response.defer()
 
-    lost_cards, draw_type = check_emergent_draw(guild_id)
+    lost_cards, draw_type = await check_emergent_draw(guild_id)
 
     deck_name = get_active_deck(guild_id)
-    embed = discord.Embed(
-        title="🔮 Deck Shuffled",
+    embed = embed_from_template(
+        _SHUFFLE_EMBED_DICT,
         description=f"**{deck_name}** has been fully reset and shuffled. Ready for a new reading! ✨",
-        color=discord.Color.purple()
+        footer={"text": f"Cards in deck: {len(deck)}"}
     )
-    embed.set_footer(text=f"Cards in deck: {len(deck)}")
     await interaction.followup.send(embed=embed)
 
     if lost_cards:
@@ -657,8 +1260,8 @@ async def shuffle(interaction: discord.Interaction):
 
 @tree.command(name="shuffle_remaining", description="Shuffle only the cards still in the deck, keeping drawn cards out")
 async def shuffle_remaining_cmd(interaction: discord.Interaction):
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
+    guild_id = get_scope_id(interaction)
+    deck = await get_deck(guild_id)
 
     if len(deck) == 0:
         await interaction.response.send_message(
@@ -668,11 +1271,11 @@ async def shuffle_remaining_cmd(interaction: discord.Interaction):
         return
 
     cards_before = len(deck)
-    shuffle_remaining(guild_id)
+    await shuffle_remaining(guild_id)
 
     await interaction.response.defer()
 
-    lost_cards, draw_type = check_emergent_draw(guild_id)
+    lost_cards, draw_type = await check_emergent_draw(guild_id)
 
     deck_name = get_active_deck(guild_id)
     total_cards = len(get_deck_cards(guild_id))
@@ -700,77 +1303,40 @@ async def draw(interaction: discord.Interaction, count: int = 1):
         await interaction.response.send_message("Please draw between 1 and 5 cards! 🎴", ephemeral=True)
         return
 
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
-
-    if len(deck) < count:
-        shuffle_deck(guild_id)
-        deck = get_deck(guild_id)
-        reshuffle_msg = "\n\n*The deck has been automatically reshuffled! 🔄*"
-    else:
-        reshuffle_msg = ""
-
-    drawn_cards = [deck.pop(0) for _ in range(count)]
-    save_undo_state(guild_id, drawn_cards)
-    reversed_cards = [random.choice([True, False]) for _ in range(count)]
+    guild_id = get_scope_id(interaction)
+    drawn_cards, reshuffle_msg, remaining = await draw_cards(guild_id, count)
+    reversed_cards = random_reversals(count)
 
     await interaction.response.defer()
 
-    composite_bytes = create_composite_image(drawn_cards, set(), reversed_cards, guild_id)
-
-    if composite_bytes:
-        file = discord.File(composite_bytes, filename="cards.png")
-        view = CardRevealView(drawn_cards, [f"Card {i+1}" for i in range(count)], interaction, reversed_cards, guild_id, reading_type="draw")
-
-        embed = discord.Embed(
-            title=f"🎴 {count} Card{'s' if count > 1 else ''} Drawn",
-            description=f"Click the buttons below to reveal each card! ✨{reshuffle_msg}",
-            color=discord.Color.blue()
-        )
-        embed.set_image(url="attachment://cards.png")
-        embed.set_footer(text=f"Cards remaining in deck: {len(deck)}")
-
-        await interaction.followup.send(embed=embed, file=file, view=view)
-    else:
-        await interaction.followup.send("Failed to create card display. Please try again!", ephemeral=True)
+    view = CardRevealView(drawn_cards, None, interaction, reversed_cards, guild_id, reading_type="draw")
+    embed = embed_from_template(
+        _DRAW_EMBED_DICT,
+        title=f"🎴 {count} Card{'s' if count > 1 else ''} Drawn",
+        description=f"Click the buttons below to reveal each card! ✨{reshuffle_msg}",
+        footer={"text": f"Cards remaining in deck: {remaining}"}
+    )
+    await send_card_reading(interaction, view, embed)
 
 @tree.command(name="ask", description="Draw a card as an answer to your question")
 @app_commands.describe(question="Your question for the cards")
 async def ask(interaction: discord.Interaction, question: str):
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
-
-    if len(deck) < 1:
-        shuffle_deck(guild_id)
-        deck = get_deck(guild_id)
-        reshuffle_msg = "\n\n*The deck has been automatically reshuffled! 🔄*"
-    else:
-        reshuffle_msg = ""
-
-    drawn_card = deck.pop(0)
-    save_undo_state(guild_id, [drawn_card])
-    is_reversed = random.choice([True, False])
+    guild_id = get_scope_id(interaction)
+    drawn_cards, reshuffle_msg, remaining = await draw_cards(guild_id, 1)
+    is_reversed = random.getrandbits(1) == 1
 
     await interaction.response.defer()
 
-    composite_bytes = create_composite_image([drawn_card], set(), [is_reversed], guild_id)
-
-    if composite_bytes:
-        file = discord.File(composite_bytes, filename="cards.png")
-        display_question = question if len(question) <= 200 else question[:197] + "..."
-        view = CardRevealView([drawn_card], ["Answer"], interaction, [is_reversed], guild_id, question=display_question)
-
-        embed = discord.Embed(
-            title="❓ Question",
-            description=f"*{display_question}*\n\nClick the button below to reveal your answer! ✨{reshuffle_msg}",
-            color=discord.Color.blue()
-        )
-        embed.set_image(url="attachment://cards.png")
-        embed.set_footer(text=f"Cards remaining in deck: {len(deck)}")
-
-        await interaction.followup.send(embed=embed, file=file, view=view)
-    else:
-        await interaction.followup.send("Failed to create card display. Please try again!", ephemeral=True)
+    display_question = question if len(question) <= 200 else question[:197] + "..."
+    view = CardRevealView(drawn_cards, ["Answer"], interaction, [is_reversed], guild_id, question=display_question)
+    embed = discord.Embed(
+        title="❓ Question",
+        description=f"*{display_question}*\n\nClick the button below to reveal your answer! ✨{reshuffle_msg}",
+        color=discord.Color.blue()
+    )
+    embed.set_image(url="attachment://cards.png")
+    embed.set_footer(text=f"Cards remaining in deck: {remaining}")
+    await send_card_reading(interaction, view, embed)
 
 @tree.command(name="spread", description="Perform a card spread reading")
 @app_commands.describe(spread_type="Type of spread to perform")
@@ -780,49 +1346,23 @@ async def ask(interaction: discord.Interaction, question: str):
     app_commands.Choice(name="Situation • Action • Outcome (3 cards)", value="situation_action_outcome"),
 ])
 async def spread(interaction: discord.Interaction, spread_type: str):
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
-
-    spreads = {
-        "past_present_future": ["Past", "Present", "Future"],
-        "mind_body_spirit": ["Mind", "Body", "Spirit"],
-        "situation_action_outcome": ["Situation", "Action", "Outcome"],
-    }
+    guild_id = get_scope_id(interaction)
 
-    positions = spreads[spread_type]
+    positions = SPREADS[spread_type]
     card_count = len(positions)
-
-    if len(deck) < card_count:
-        shuffle_deck(guild_id)
-        deck = get_deck(guild_id)
-        reshuffle_msg = "\n\n*The deck has been automatically reshuffled! 🔄*"
-    else:
-        reshuffle_msg = ""
-
-    drawn_cards = [deck.pop(0) for _ in range(card_count)]
-    save_undo_state(guild_id, drawn_cards)
-    reversed_cards = [random.choice([True, False]) for _ in range(card_count)]
+    drawn_cards, reshuffle_msg, remaining = await draw_cards(guild_id, card_count)
+    reversed_cards = random_reversals(card_count)
 
     await interaction.response.defer()
 
-    composite_bytes = create_composite_image(drawn_cards, set(), reversed_cards, guild_id)
-
-    if composite_bytes:
-        file = discord.File(composite_bytes, filename="cards.png")
-        view = CardRevealView(drawn_cards, positions, interaction, reversed_cards, guild_id)
-        spread_title = spread_type.replace("_", " • ").title()
-
-        embed = discord.Embed(
-            title=f"🔮 {spread_title} Spread",
-            description=f"Your cards have been laid out. Click each position to reveal! ✨{reshuffle_msg}",
-            color=discord.Color.purple()
-        )
-        embed.set_image(url="attachment://cards.png")
-        embed.set_footer(text=f"Cards remaining in deck: {len(deck)}")
-
-        await interaction.followup.send(embed=embed, file=file, view=view)
-    else:
-        await interaction.followup.send("Failed to create card display. Please try again!", ephemeral=True)
+    view = CardRevealView(drawn_cards, positions, interaction, reversed_cards, guild_id)
+    embed = embed_from_template(
+        _SPREAD_EMBED_DICT,
+        title=f"🔮 {SPREAD_TITLES[spread_type]} Spread",
+        description=f"Your cards have been laid out. Click each position to reveal! ✨{reshuffle_msg}",
+        footer={"text": f"Cards remaining in deck: {remaining}"}
+    )
+    await send_card_reading(interaction, view, embed)
 
 @tree.command(name="custom_spread", description="Create your own custom card spread")
 @app_commands.describe(
@@ -830,8 +1370,7 @@ async def spread(interaction: discord.Interaction, spread_type: str):
     positions="Position names separated by commas (e.g., 'Past, Present, Future')"
 )
 async def custom_spread(interaction: discord.Interaction, name: str, positions: str):
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
+    guild_id = get_scope_id(interaction)
 
     position_list = [p.strip() for p in positions.split(",") if p.strip()]
 
@@ -844,44 +1383,28 @@ async def custom_spread(interaction: discord.Interaction, name: str, positions:
         return
 
     card_count = len(position_list)
-
-    if len(deck) < card_count:
-        shuffle_deck(guild_id)
-        deck = get_deck(guild_id)
-        reshuffle_msg = "\n\n*The deck has been automatically reshuffled! 🔄*"
-    else:
-        reshuffle_msg = ""
-
-    drawn_cards = [deck.pop(0) for _ in range(card_count)]
-    save_undo_state(guild_id, drawn_cards)
-    reversed_cards = [random.choice([True, False]) for _ in range(card_count)]
+    drawn_cards, reshuffle_msg, remaining = await draw_cards(guild_id, card_count)
+    reversed_cards = random_reversals(card_count)
 
     await interaction.response.defer()
 
-    composite_bytes = create_composite_image(drawn_cards, set(), reversed_cards, guild_id)
-
-    if composite_bytes:
-        file = discord.File(composite_bytes, filename="cards.png")
-        view = CardRevealView(drawn_cards, position_list, interaction, reversed_cards, guild_id)
-
-        embed = discord.Embed(
-            title=f"🔮 {name} Spread",
-            description=f"Your custom spread has been laid out. Click each position to reveal! ✨{reshuffle_msg}\n\n**Positions:** {', '.join(position_list)}",
-            color=discord.Color.purple()
-        )
-        embed.set_image(url="attachment://cards.png")
-        embed.set_footer(text=f"Cards remaining in deck: {len(deck)}")
-
-        await interaction.followup.send(embed=embed, file=file, view=view)
-    else:
-        await interaction.followup.send("Failed to create card display. Please try again!", ephemeral=True)
+    view = CardRevealView(drawn_cards, position_list, interaction, reversed_cards, guild_id)
+    embed = discord.Embed(
+        title=f"🔮 {name} Spread",
+        description=f"Your custom spread has been laid out. Click each position to reveal! ✨{reshuffle_msg}\n\n**Positions:** {', '.join(position_list)}",
+        color=discord.Color.purple()
+    )
+    embed.set_image(url="attachment://cards.png")
+    embed.set_footer(text=f"Cards remaining in deck: {remaining}")
+    await send_card_reading(interaction, view, embed)
 
 @tree.command(name="deck_info", description="See information about the current deck")
 async def deck_info(interaction: discord.Interaction):
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
+    guild_id = get_scope_id(interaction)
+    deck = await get_deck(guild_id)
     deck_name = get_active_deck(guild_id)
-    total_cards = len(get_deck_cards(guild_id))
+    total_cards = len(get_deck_card_names(guild_id))
+    remaining = len(deck)
 
     embed = discord.Embed(
         title="🎴 Current Deck",
@@ -889,18 +1412,17 @@ async def deck_info(interaction: discord.Interaction):
         color=discord.Color.gold()
     )
     embed.add_field(name="Total Cards", value=str(total_cards), inline=True)
-    embed.add_field(name="Remaining", value=str(len(deck)), inline=True)
-    embed.add_field(name="Drawn", value=str(total_cards - len(deck)), inline=True)
+    embed.add_field(name="Remaining", value=str(remaining), inline=True)
+    embed.add_field(name="Drawn", value=str(total_cards - remaining), inline=True)
 
     await interaction.response.send_message(embed=embed)
 
 @tree.command(name="card_info", description="Look up a specific card's meaning")
 @app_commands.describe(card_name="Name of the card to look up")
 async def card_info(interaction: discord.Interaction, card_name: str):
-    guild_id = interaction.guild_id or interaction.user.id
+    guild_id = get_scope_id(interaction)
     active_cards = get_deck_cards(guild_id)
-    card_name_lower = card_name.lower()
-    matches = [name for name in active_cards.keys() if card_name_lower in name.lower()]
+    matches = find_cards(card_name, guild_id)
 
     if not matches:
         await interaction.response.send_message(
@@ -933,53 +1455,49 @@ async def card_info(interaction: discord.Interaction, card_name: str):
 
 @tree.command(name="undo", description="Undo the last card draw and return cards to the deck")
 async def undo(interaction: discord.Interaction):
-    guild_id = interaction.guild_id or interaction.user.id
+    guild_id = get_scope_id(interaction)
+    cards = await undo_draw(guild_id)
 
-    if not can_undo(guild_id):
+    if not cards:
         await interaction.response.send_message(
             "❌ No recent draw to undo! You can only undo the most recent draw.",
             ephemeral=True
         )
         return
 
-    cards = undo_draw(guild_id)
     card_list = ", ".join(cards)
 
-    embed = discord.Embed(
-        title="↩️ Draw Undone",
-        description=f"Returned {len(cards)} card{'s' if len(cards) > 1 else ''} to the deck:\n*{card_list}*",
-        color=discord.Color.green()
+    embed = embed_from_template(
+        _UNDO_EMBED_DICT,
+        description=f"Returned {len(cards)} card{'s' if len(cards) > 1 else ''} to the deck:\n*{card_list}*"
     )
-    embed.set_footer(text="These cards have been placed back at the top of the deck")
 
     await interaction.response.send_message(embed=embed)
 
 @tree.command(name="undo_and_shuffle", description="Undo the last draw, return cards, and shuffle the remaining deck")
 async def undo_and_shuffle(interaction: discord.Interaction):
-    guild_id = interaction.guild_id or interaction.user.id
+    guild_id = get_scope_id(interaction)
+    cards = await undo_draw(guild_id)
 
-    if not can_undo(guild_id):
+    if not cards:
         await interaction.response.send_message(
             "❌ No recent draw to undo! You can only undo the most recent draw.",
             ephemeral=True
         )
         return
 
-    cards = undo_draw(guild_id)
     card_list = ", ".join(cards)
-    deck = get_deck(guild_id)
-    random.shuffle(deck)
+    deck = await shuffle_remaining(guild_id)
 
     await interaction.response.defer()
 
-    lost_cards, draw_type = check_emergent_draw(guild_id)
+    lost_cards, draw_type = await check_emergent_draw(guild_id)
 
-    embed = discord.Embed(
-        title="↩️🔀 Undone & Shuffled",
+    embed = embed_from_template(
+        _UNDO_SHUFFLE_EMBED_DICT,
         description=f"Returned {len(cards)} card{'s' if len(cards) > 1 else ''} to the deck:\n*{card_list}*\n\nThe entire deck has been shuffled! ✨",
-        color=discord.Color.green()
+        footer={"text": f"{len(deck)} cards in deck"}
     )
-    embed.set_footer(text=f"{len(deck)} cards in deck")
     await interaction.followup.send(embed=embed)
 
     if lost_cards:
@@ -987,44 +1505,20 @@ async def undo_and_shuffle(interaction: discord.Interaction):
 
 @tree.command(name="pull_clarifier", description="Draw an additional card to clarify a previous reading")
 async def pull_clarifier(interaction: discord.Interaction):
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
-
-    if len(deck) < 1:
-        shuffle_deck(guild_id)
-        deck = get_deck(guild_id)
-        reshuffle_msg = "\n\n*The deck has been automatically reshuffled! 🔄*"
-    else:
-        reshuffle_msg = ""
-
-    drawn_card = deck.pop(0)
-
-    if can_undo(guild_id):
-        undo_state[guild_id].append(drawn_card)
-    else:
-        save_undo_state(guild_id, [drawn_card])
-
-    is_reversed = random.choice([True, False])
+    guild_id = get_scope_id(interaction)
+    # A clarifier belongs to the previous reading, so undo returns it along with that reading's cards
+    drawn_cards, reshuffle_msg, remaining = await draw_cards(guild_id, 1, extend_undo=True)
+    is_reversed = random.getrandbits(1) == 1
 
     await interaction.response.defer()
 
-    composite_bytes = create_composite_image([drawn_card], set(), [is_reversed], guild_id)
-
-    if composite_bytes:
-        file = discord.File(composite_bytes, filename="cards.png")
-        view = CardRevealView([drawn_card], ["Clarifier"], interaction, [is_reversed], guild_id)
-
-        embed = discord.Embed(
-            title="🔍 Clarifier Card",
-            description=f"An additional card drawn to provide clarity or deeper insight.{reshuffle_msg}",
-            color=discord.Color.gold()
-        )
-        embed.set_image(url="attachment://cards.png")
-        embed.set_footer(text=f"Cards remaining in deck: {len(deck)}")
-
-        await interaction.followup.send(embed=embed, file=file, view=view)
-    else:
-        await interaction.followup.send("Failed to create card display. Please try again!", ephemeral=True)
+    view = CardRevealView(drawn_cards, ["Clarifier"], interaction, [is_reversed], guild_id)
+    embed = embed_from_template(
+        _CLARIFIER_EMBED_DICT,
+        description=f"An additional card drawn to provide clarity or deeper insight.{reshuffle_msg}",
+        footer={"text": f"Cards remaining in deck: {remaining}"}
+    )
+    await send_card_reading(interaction, view, embed)
 
 @tree.command(name="reading_for", description="Perform a reading for another person")
 @app_commands.describe(
@@ -1039,12 +1533,11 @@ async def pull_clarifier(interaction: discord.Interaction):
     app_commands.Choice(name="Situation • Action • Outcome", value="situation_action_outcome"),
 ])
 async def reading_for(interaction: discord.Interaction, user: discord.User, reading_type: str):
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
+    guild_id = get_scope_id(interaction)
 
     if reading_type == "draw":
         card_count = 3
-        positions = [f"Card {i+1}" for i in range(card_count)]
+        positions = DEFAULT_POSITIONS[:card_count]
         title = f"🎴 Reading for {user.display_name}"
         color = discord.Color.blue()
     elif reading_type == "ask":
@@ -1053,53 +1546,30 @@ async def reading_for(interaction: discord.Interaction, user: discord.User, read
         title = f"❓ Question Reading for {user.display_name}"
         color = discord.Color.blue()
     else:
-        spreads = {
-            "past_present_future": ["Past", "Present", "Future"],
-            "mind_body_spirit": ["Mind", "Body", "Spirit"],
-            "situation_action_outcome": ["Situation", "Action", "Outcome"],
-        }
-        positions = spreads[reading_type]
+        positions = SPREADS[reading_type]
         card_count = len(positions)
-        spread_title = reading_type.replace("_", " • ").title()
+        spread_title = SPREAD_TITLES[reading_type]
         title = f"🔮 {spread_title} Spread for {user.display_name}"
         color = discord.Color.purple()
 
-    if len(deck) < card_count:
-        shuffle_deck(guild_id)
-        deck = get_deck(guild_id)
-        reshuffle_msg = "\n\n*The deck has been automatically reshuffled! 🔄*"
-    else:
-        reshuffle_msg = ""
-
-    drawn_cards = [deck.pop(0) for _ in range(card_count)]
-    save_undo_state(guild_id, drawn_cards)
-    reversed_cards = [random.choice([True, False]) for _ in range(card_count)]
+    drawn_cards, reshuffle_msg, remaining = await draw_cards(guild_id, card_count)
+    reversed_cards = random_reversals(card_count)
 
     await interaction.response.defer()
 
-    composite_bytes = create_composite_image(drawn_cards, set(), reversed_cards, guild_id)
-
-    if composite_bytes:
-        file = discord.File(composite_bytes, filename="cards.png")
-        view = CardRevealView(drawn_cards, positions, interaction, reversed_cards, guild_id, reading_type=reading_type, for_user=user.id)
-
-        embed = discord.Embed(
-            title=title,
-            description=f"{user.mention} — Click the buttons below to reveal each card! ✨{reshuffle_msg}",
-            color=color
-        )
-        embed.set_image(url="attachment://cards.png")
-        embed.set_footer(text=f"Reading by {interaction.user.display_name} • Cards remaining: {len(deck)}")
-
-        await interaction.followup.send(
-            content=f"🔮 Reading for {user.mention}",
-            embed=embed,
-            file=file,
-            view=view,
-            allowed_mentions=discord.AllowedMentions(users=True)
-        )
-    else:
-        await interaction.followup.send("Failed to create card display. Please try again!", ephemeral=True)
+    view = CardRevealView(drawn_cards, positions, interaction, reversed_cards, guild_id, reading_type=reading_type, for_user=user.id)
+    embed = discord.Embed(
+        title=title,
+        description=f"{user.mention} — Click the buttons below to reveal each card! ✨{reshuffle_msg}",
+        color=color
+    )
+    embed.set_image(url="attachment://cards.png")
+    embed.set_footer(text=f"Reading by {interaction.user.display_name} • Cards remaining: {remaining}")
+    await send_card_reading(
+        interaction, view, embed,
+        content=f"🔮 Reading for {user.mention}",
+        allowed_mentions=discord.AllowedMentions(users=True)
+    )
 
 @tree.command(name="journal", description="Save your last reading to your personal journal")
 @app_commands.describe(
@@ -1116,11 +1586,35 @@ async def journal(interaction: discord.Interaction, name: str, notes: str):
         )
         return
 
+    if not GITHUB_TOKEN:
+        await interaction.response.send_message(
+            "❌ Failed to save journal entry. Make sure GITHUB_TOKEN is set in Railway!",
+            ephemeral=True
+        )
+        return
+
     await interaction.response.defer(ephemeral=True)
 
-    journals, sha = get_journals_from_github()
+    reading = last_readings[user_id]
     user_id_str = str(user_id)
-    existing = next((j for j in journals if j.get("user_id") == user_id_str and j.get("name").lower() == name.lower()), None)
+    async with journal_lock:
+        loaded = await refresh_journal_cache()
+        existing = journal_key(user_id_str, name) in journal_cache["index"]
+        if loaded and not existing:
+            add_journal_entry({
+                "user_id": user_id_str,
+                "name": name,
+                "timestamp": reading["timestamp"],
+                "reading_type": reading["reading_type"],
+                "question": reading["question"],
+                "for_user": reading.get("for_user"),
+                "cards": reading["cards"],
+                "notes": notes
+            })
+
+    if not loaded:
+        await interaction.followup.send("❌ Couldn't load your journal right now. Please try again.", ephemeral=True)
+        return
 
     if existing:
         await interaction.followup.send(
@@ -1129,47 +1623,23 @@ async def journal(interaction: discord.Interaction, name: str, notes: str):
         )
         return
 
-    reading = last_readings[user_id]
-    entry = {
-        "user_id": user_id_str,
-        "name": name,
-        "timestamp": reading["timestamp"],
-        "reading_type": reading["reading_type"],
-        "question": reading["question"],
-        "for_user": reading.get("for_user"),
-        "cards": reading["cards"],
-        "notes": notes
-    }
-
-    journals.append(entry)
+    cards_display = format_journal_cards(reading["cards"])
 
-    if save_journals_to_github(journals, sha):
-        cards_display = "\n".join([
-            f"• **{card['position']}:** {card['name']}{' (Reversed)' if card['reversed'] else ''}"
-            for card in reading["cards"]
-        ])
-
-        for_user_text = ""
-        if reading.get("for_user"):
-            try:
-                user_obj = await interaction.client.fetch_user(int(reading["for_user"]))
-                for_user_text = f"**Reading for:** {user_obj.name}\n\n"
-            except:
-                for_user_text = f"**Reading for:** User ID {reading['for_user']}\n\n"
+    for_user_text = ""
+    if reading.get("for_user"):
+        try:
+            for_user_text = f"**Reading for:** {await get_user_name(int(reading['for_user']))}\n\n"
+        except:
+            for_user_text = f"**Reading for:** User ID {reading['for_user']}\n\n"
 
-        embed = discord.Embed(
-            title="📝 Reading Journaled",
-            description=f"**Name:** {name}\n\n{for_user_text}**Your Notes:**\n{notes}\n\n**Cards:**\n{cards_display}",
-            color=discord.Color.green()
-        )
-        embed.set_footer(text=f"Saved • {datetime.fromisoformat(reading['timestamp']).strftime('%B %d, %Y at %I:%M %p')} UTC")
+    embed = discord.Embed(
+        title="📝 Reading Journaled",
+        description=f"**Name:** {name}\n\n{for_user_text}**Your Notes:**\n{notes}\n\n**Cards:**\n{cards_display}",
+        color=discord.Color.green()
+    )
+    embed.set_footer(text=f"Saved • {datetime.fromisoformat(reading['timestamp']).strftime('%B %d, %Y at %I:%M %p')} UTC")
 
-        await interaction.followup.send(embed=embed, ephemeral=True)
-    else:
-        await interaction.followup.send(
-            "❌ Failed to save journal entry. Make sure GITHUB_TOKEN is set in Railway!",
-            ephemeral=True
-        )
+    await interaction.followup.send(embed=embed, ephemeral=True)
 
 @tree.command(name="journal_view", description="View your journal entries")
 @app_commands.describe(name="Optional: View a specific entry by name")
@@ -1178,8 +1648,13 @@ async def journal_view(interaction: discord.Interaction, name: str = None):
 
     await interaction.response.defer(ephemeral=True)
 
-    journals, _ = get_journals_from_github()
-    user_journals = [j for j in journals if j.get("user_id") == user_id]
+    async with journal_lock:
+        loaded = await refresh_journal_cache()
+    if not loaded:
+        await interaction.followup.send("❌ Couldn't load your journal right now. Please try again.", ephemeral=True)
+        return
+
+    user_journals = get_user_journals(user_id)
 
     if not user_journals:
         await interaction.followup.send(
@@ -1189,15 +1664,12 @@ async def journal_view(interaction: discord.Interaction, name: str = None):
         return
 
     if name:
-        entry = next((j for j in user_journals if j.get("name").lower() == name.lower()), None)
+        entry = journal_cache["index"].get(journal_key(user_id, name))
         if not entry:
             await interaction.followup.send(f"❌ Entry '{name}' not found in your journal!", ephemeral=True)
             return
 
-        cards_display = "\n".join([
-            f"• **{card['position']}:** {card['name']}{' (Reversed)' if card['reversed'] else ''}"
-            for card in entry["cards"]
-        ])
+        cards_display = format_journal_cards(entry["cards"])
 
         question_text = f"**Question:** *{entry['question']}*\n\n" if entry.get("question") else ""
 
@@ -1211,13 +1683,8 @@ async def journal_view(interaction: discord.Interaction, name: str = None):
 
         await interaction.followup.send(embed=embed, ephemeral=True)
     else:
-        sorted_entries = sorted(user_journals, key=lambda x: x['timestamp'], reverse=True)
-
-        if len(sorted_entries) <= 10:
-            entries_list = "\n".join([
-                f"• **{j['name']}** - {datetime.fromisoformat(j['timestamp']).strftime('%b %d, %Y')}"
-                for j in sorted_entries
-            ])
+        if len(user_journals) <= 10:
+            entries_list = "\n".join(format_journal_line(j) for j in user_journals)
             embed = discord.Embed(
                 title=f"📖 Your Journal ({len(user_journals)} entries)",
                 description=f"{entries_list}\n\nUse `/journal_view [name]` to view a specific entry.",
@@ -1225,18 +1692,15 @@ async def journal_view(interaction: discord.Interaction, name: str = None):
             )
             await interaction.followup.send(embed=embed, ephemeral=True)
         else:
-            page_entries = sorted_entries[:10]
-            entries_list = "\n".join([
-                f"• **{j['name']}** - {datetime.fromisoformat(j['timestamp']).strftime('%b %d, %Y')}"
-                for j in page_entries
-            ])
+            # The view formats every entry once; the first page reuses those lines
+            view = JournalPaginationView(user_journals, user_id, page=0, per_page=10)
+            entries_list = "\n".join(view.entry_lines[:10])
             embed = discord.Embed(
                 title=f"📖 Your Journal ({len(user_journals)} entries)",
                 description=f"{entries_list}\n\nUse `/journal_view [name]` to view a specific entry.",
                 color=discord.Color.blue()
             )
-            embed.set_footer(text=f"Page 1 of {(len(sorted_entries) - 1) // 10 + 1}")
-            view = JournalPaginationView(sorted_entries, user_id, page=0, per_page=10)
+            embed.set_footer(text=f"Page 1 of {view.max_page + 1}")
             await interaction.followup.send(embed=embed, view=view, ephemeral=True)
 
 @tree.command(name="journal_delete", description="Delete a journal entry")
@@ -1244,25 +1708,32 @@ async def journal_view(interaction: discord.Interaction, name: str = None):
 async def journal_delete(interaction: discord.Interaction, name: str):
     user_id = str(interaction.user.id)
 
+    if not GITHUB_TOKEN:
+        await interaction.response.send_message("❌ Failed to delete entry. Make sure GITHUB_TOKEN is set in Railway!", ephemeral=True)
+        return
+
     await interaction.response.defer(ephemeral=True)
 
-    journals, sha = get_journals_from_github()
-    entry = next((j for j in journals if j.get("name").lower() == name.lower() and j.get("user_id") == user_id), None)
+    async with journal_lock:
+        loaded = await refresh_journal_cache()
+        key = journal_key(user_id, name)
+        entry = journal_cache["index"].get(key) if loaded else None
+        if entry:
+            delete_journal_entry(key)
+
+    if not loaded:
+        await interaction.followup.send("❌ Failed to delete entry. Please try again.", ephemeral=True)
+        return
 
     if not entry:
         await interaction.followup.send(f"❌ Entry '{name}' not found in your journal!", ephemeral=True)
         return
 
-    journals = [j for j in journals if not (j.get("name").lower() == name.lower() and j.get("user_id") == user_id)]
-
-    if save_journals_to_github(journals, sha):
-        await interaction.followup.send(f"🗑️ Entry '{name}' deleted from your journal.", ephemeral=True)
-    else:
-        await interaction.followup.send("❌ Failed to delete entry. Please try again.", ephemeral=True)
+    await interaction.followup.send(f"🗑️ Entry '{name}' deleted from your journal.", ephemeral=True)
 
 @tree.command(name="deck_list", description="View all available decks")
 async def deck_list(interaction: discord.Interaction):
-    guild_id = interaction.guild_id or interaction.user.id
+    guild_id = get_scope_id(interaction)
     current_deck = get_active_deck(guild_id)
 
     if not loaded_decks:
@@ -1287,7 +1758,7 @@ async def deck_list(interaction: discord.Interaction):
 @tree.command(name="deck_switch", description="Switch to a different deck")
 @app_commands.describe(deck_name="The name of the deck to switch to")
 async def deck_switch(interaction: discord.Interaction, deck_name: str):
-    guild_id = interaction.guild_id or interaction.user.id
+    guild_id = get_scope_id(interaction)
 
     deck_match = None
     for name in loaded_decks.keys():
@@ -1317,15 +1788,15 @@ async def deck_switch(interaction: discord.Interaction, deck_name: str):
 @tree.command(name="daily_card", description="Draw and post a daily card to a channel")
 @app_commands.describe(channel="The channel to post the daily card to")
 async def daily_card(interaction: discord.Interaction, channel: discord.TextChannel):
-    guild_id = interaction.guild_id or interaction.user.id
-    deck = get_deck(guild_id)
+    guild_id = get_scope_id(interaction)
+    deck = await get_deck(guild_id)
 
     if len(deck) < 1:
-        shuffle_deck(guild_id)
-        deck = get_deck(guild_id)
+        deck = shuffle_deck(guild_id)
 
-    drawn_card = deck.pop(0)
-    is_reversed = random.choice([True, False])
+    drawn_card = deck.popleft()
+    mark_deck_dirty(guild_id)
+    is_reversed = random.getrandbits(1) == 1
     active_cards = get_deck_cards(guild_id)
     card_meaning = active_cards.get(drawn_card, "")
     card_url = get_card_image_url(drawn_card, guild_id)
@@ -1380,6 +1851,8 @@ async def request_reading(interaction: discord.Interaction, topic: str = None):
         allowed_mentions=discord.AllowedMentions(roles=True, users=True)
     )
 
+WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
+
 @tree.command(name="reading_stats", description="View statistics about your readings")
 async def reading_stats_command(interaction: discord.Interaction):
     await interaction.response.defer(ephemeral=True)
@@ -1393,44 +1866,42 @@ async def reading_stats_command(interaction: discord.Interaction):
     today = datetime.utcnow().date()
     streak = 0
     check_date = today
-    while check_date.isoformat() in stats["readings_by_date"]:
+    readings_by_date = stats["readings_by_date"]
+    while check_date.isoformat() in readings_by_date:
         streak += 1
-        check_date = check_date.replace(day=check_date.day - 1) if check_date.day > 1 else check_date.replace(month=check_date.month - 1, day=28)
+        check_date -= timedelta(days=1)
 
-    day_counts = {}
-    for date_str, count in stats["readings_by_date"].items():
-        date_obj = datetime.fromisoformat(date_str)
-        day_name = date_obj.strftime("%A")
-        if day_name not in day_counts:
-            day_counts[day_name] = 0
-        day_counts[day_name] += count
+    day_counts = Counter()
+    for date_str, count in readings_by_date.items():
+        day_counts[WEEKDAY_NAMES[datetime.fromisoformat(date_str).weekday()]] += count
 
-    most_active_day = max(day_counts.items(), key=lambda x: x[1]) if day_counts else ("N/A", 0)
+    most_active_day = day_counts.most_common(1)[0] if day_counts else ("N/A", 0)
+
+    top_people = stats["readings_by_person"].most_common(5)
+    user_ids = [person_id for person_id, _ in top_people if person_id != "personal"]
+    user_names = dict(zip(user_ids, await asyncio.gather(
+        *(get_user_name(int(person_id)) for person_id in user_ids), return_exceptions=True
+    )))
 
     person_list = []
-    for person_id, count in sorted(stats["readings_by_person"].items(), key=lambda x: x[1], reverse=True)[:5]:
+    for person_id, count in top_people:
         if person_id == "personal":
             person_list.append(f"• Personal: {count} readings")
+        elif isinstance(user_names[person_id], str):
+            person_list.append(f"• {user_names[person_id]}: {count} readings")
         else:
-            try:
-                user_obj = await interaction.client.fetch_user(int(person_id))
-                person_list.append(f"• {user_obj.name}: {count} readings")
-            except:
-                person_list.append(f"• User {person_id}: {count} readings")
+            person_list.append(f"• User {person_id}: {count} readings")
 
     person_text = "\n".join(person_list) if person_list else "No readings yet"
 
-    guild_id = interaction.guild_id or interaction.user.id
+    guild_id = get_scope_id(interaction)
     active_cards = get_deck_cards(guild_id)
 
-    if stats["cards_drawn"]:
-        most_drawn = max(stats["cards_drawn"].items(), key=lambda x: x[1])
-        least_drawn = min(stats["cards_drawn"].items(), key=lambda x: x[1])
-        all_cards = set(active_cards.keys())
-        drawn_cards_set = set(stats["cards_drawn"].keys())
-        never_drawn = all_cards - drawn_cards_set
-        if never_drawn:
-            least_drawn = (list(never_drawn)[0], 0)
+    cards_drawn = stats["cards_drawn"]
+    if cards_drawn:
+        most_drawn = max(cards_drawn.items(), key=itemgetter(1))
+        never_drawn = next((card for card in active_cards if card not in cards_drawn), None)
+        least_drawn = (never_drawn, 0) if never_drawn is not None else min(cards_drawn.items(), key=itemgetter(1))
         cards_text = f"**Most Drawn:** {most_drawn[0]} ({most_drawn[1]} times)\n**Least Drawn:** {least_drawn[0]} ({least_drawn[1]} times)"
     else:
         cards_text = "No card data yet"
@@ -1531,10 +2002,30 @@ async def help_command(interaction: discord.Interaction):
     embed.set_footer(text="✨ The cards are always listening.")
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
+# on_ready fires again on every gateway reconnect; the command tree only needs syncing once
+commands_synced = False
+prewarm_task = None
+
 @client.event
 async def on_ready():
-    load_decks_from_github()
-    await tree.sync()
+    global commands_synced, prewarm_task, deck_flush_task, journal_flush_task
+    await open_http_session()
+    await load_decks_from_github()
+    build_deck_tables()
+    if not deck_store_ready:
+        await asyncio.to_thread(open_deck_store)
+        deck_flush_task = asyncio.create_task(flush_deck_state_loop())
+    if journal_flush_task is None:
+        journal_flush_task = asyncio.create_task(flush_journals_loop())
+    if prewarm_task is None:
+        # Runs in the background so journals and face-down renders aren't held up behind every card download
+        prewarm_task = asyncio.create_task(prewarm_image_cache())
+    if not commands_synced:
+        await tree.sync()
+        commands_synced = True
+        await prerender_facedown_composites()
+        async with journal_lock:
+            await refresh_journal_cache()
     print(f'✅ Logged in as {client.user}')
     print(f'🔮 Oracle card bot ready!')
     print(f'📦 Loaded {len(loaded_decks)} deck(s): {", ".join(loaded_decks.keys())}')